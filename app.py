@@ -36,7 +36,8 @@ try:
         dashboard.render_dashboard(
             df_country=df_country,
             df_category=df_category,
-            df_analise_completa=df_transactions
+            df_analise_completa=df_transactions,
+            df_opps=df_opps_scored
         )
         
     with tab3:
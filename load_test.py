@@ -0,0 +1,197 @@
+import argparse
+import json
+import multiprocessing
+import random
+import resource
+import sys
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from streamlit.testing.v1 import AppTest
+
+APP_FILE = Path(__file__).resolve().parent / "app.py"
+
+# --- Interações simuladas ---
+# Cada interação recebe a sessão (AppTest) e o gerador aleatório da sessão e dispara um rerun.
+# Observação: o Streamlit executa o conteúdo de todas as abas a cada rerun, então "abrir o dashboard"
+# não gera um evento no servidor; o custo do dashboard está embutido em todas as interações e a
+# interação 'rerun_dashboard' mede um rerun simples.
+
+def _click_radar(position: int):
+    def interaction(at: AppTest, rng: random.Random):
+        buttons = [b for b in at.button if b.key and b.key.startswith("button_")]
+        buttons[position % len(buttons)].click().run()
+    return interaction
+
+def _select_random(key: str):
+    def interaction(at: AppTest, rng: random.Random):
+        selectbox = at.selectbox(key=key)
+        selectbox.select(rng.choice(selectbox.options)).run()
+    return interaction
+
+def _rerun(at: AppTest, rng: random.Random):
+    at.run()
+
+SCENARIOS = {
+    "radar": [
+        ("radar_top1", _click_radar(0)),
+        ("radar_top2", _click_radar(1)),
+        ("radar_top3", _click_radar(2)),
+    ],
+    "tese": [
+        ("trocar_pais", _select_random("sb_country")),
+        ("trocar_categoria", _select_random("sb_category")),
+        ("trocar_pais", _select_random("sb_country")),
+    ],
+    "dashboard": [
+        ("rerun_dashboard", _rerun),
+        ("trocar_pais", _select_random("sb_country")),
+        ("rerun_dashboard", _rerun),
+    ],
+}
+
+def _current_rss_mb() -> float:
+    """RSS atual do processo (Linux); retorna NaN onde /proc não está disponível."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * resource.getpagesize() / (1024 * 1024)
+    except (OSError, IndexError, ValueError):
+        return float("nan")
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss é em KB no Linux e em bytes no macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def run_session(session_id: int, scenario: str, iterations: int, timeout: float, seed: int, start) -> tuple:
+    """
+    Executa uma sessão: carrega o app e repete a sequência de interações do cenário.
+    Roda em um processo próprio (ver run_load_test).
+
+    Returns:
+        tuple: (um dicionário por interação com sessão, cenário, nome, latência (ms) e erro;
+                pico de memória do processo em MB).
+    """
+    rng = random.Random(seed + session_id)
+    steps = [("carregar_app", _rerun)] + SCENARIOS[scenario] * iterations
+    at = AppTest.from_file(str(APP_FILE), default_timeout=timeout)
+    start.wait()
+
+    results = []
+    for name, interaction in steps:
+        inicio = time.perf_counter()
+        erro = None
+        try:
+            interaction(at, rng)
+            if at.exception:
+                erro = at.exception[0].value
+        except Exception as e:
+            erro = f"{type(e).__name__}: {e}"
+        results.append({
+            'sessao': session_id,
+            'cenario': scenario,
+            'interacao': name,
+            'latencia_ms': (time.perf_counter() - inicio) * 1000,
+            'erro': erro,
+        })
+    return results, _peak_rss_mb()
+
+def summarize(df_results: pd.DataFrame) -> pd.DataFrame:
+    """
+    Calcula contagem, erros e latências p50/p95/p99 por interação.
+    As latências consideram só as interações sem erro: uma falha rápida não deve melhorar os percentis.
+    """
+    def percentis(latencias: pd.Series) -> pd.Series:
+        p50, p95, p99 = np.percentile(latencias, [50, 95, 99])
+        return pd.Series({'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99, 'max_ms': latencias.max()})
+
+    grupos = df_results.groupby('interacao')
+    df_resumo = pd.DataFrame({'n': grupos.size(), 'erros': grupos['erro'].count()})
+    df_resumo['taxa_erro_pct'] = df_resumo['erros'] / df_resumo['n'] * 100
+
+    df_sucesso = df_results[df_results['erro'].isna()]
+    if not df_sucesso.empty:
+        df_latencias = df_sucesso.groupby('interacao')['latencia_ms'].apply(percentis).unstack()
+        df_resumo = df_resumo.join(df_latencias)
+    else:
+        df_resumo = df_resumo.reindex(columns=list(df_resumo.columns) + ['p50_ms', 'p95_ms', 'p99_ms', 'max_ms'])
+    return df_resumo.sort_values('p95_ms', ascending=False, na_position='last')
+
+def run_load_test(sessions: int, iterations: int, scenarios: list, timeout: float, seed: int) -> dict:
+    """
+    Simula `sessions` sessões simultâneas do app, distribuídas entre os cenários em rodízio.
+
+    O AppTest não é thread-safe (o Runtime do Streamlit é um singleton global), então cada sessão
+    roda em um processo próprio. O teste mede a latência de cada sessão com as demais disputando
+    CPU e disco, mas cada processo tem seus próprios caches: o ganho de um cache compartilhado entre
+    sessões de um mesmo servidor não aparece aqui, e a memória é reportada por processo.
+
+    Returns:
+        dict: Resumo por interação, vazão (interações sem erro/s), memória e erros.
+    """
+    with multiprocessing.Manager() as manager:
+        # O timeout evita que a coordenação fique presa se uma sessão falhar antes de chegar à barreira
+        barreira = manager.Barrier(sessions + 1, timeout=timeout)
+        with ProcessPoolExecutor(max_workers=sessions) as pool:
+            futures = [
+                pool.submit(run_session, i, scenarios[i % len(scenarios)], iterations, timeout, seed, barreira)
+                for i in range(sessions)
+            ]
+            barreira.wait()
+            inicio = time.perf_counter()
+            sessoes = [future.result() for future in futures]
+            duracao = time.perf_counter() - inicio
+
+    df_results = pd.DataFrame([r for resultados, _ in sessoes for r in resultados])
+    rss_pico = [pico for _, pico in sessoes]
+    sucesso = int(df_results['erro'].isna().sum())
+    return {
+        'resumo': summarize(df_results),
+        'interacoes': len(df_results),
+        'interacoes_com_erro': len(df_results) - sucesso,
+        'duracao_s': duracao,
+        'vazao_por_s': sucesso / duracao,
+        'rss_coordenador_mb': _current_rss_mb(),
+        'rss_pico_por_sessao_mb': max(rss_pico),
+        'rss_pico_total_mb': sum(rss_pico),
+        'erros': df_results['erro'].dropna().value_counts().head(5).to_dict(),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Teste de carga do app Streamlit com sessões simultâneas (AppTest, um processo por sessão).")
+    parser.add_argument("--sessions", type=int, default=50, help="Número de sessões simultâneas.")
+    parser.add_argument("--iterations", type=int, default=3, help="Repetições da sequência de cada cenário por sessão.")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"Cenários separados por vírgula ({', '.join(SCENARIOS)}).")
+    parser.add_argument("--timeout", type=float, default=120, help="Tempo máximo de cada rerun, em segundos.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--json", help="Grava o resultado neste arquivo JSON para comparação entre versões.")
+    args = parser.parse_args()
+
+    cenarios = [c.strip() for c in args.scenarios.split(",") if c.strip()]
+    invalidos = [c for c in cenarios if c not in SCENARIOS]
+    if invalidos:
+        parser.error(f"Cenário(s) desconhecido(s): {', '.join(invalidos)}")
+
+    print(f"--- TESTE DE CARGA: {args.sessions} sessões, cenários {cenarios}, {args.iterations} iterações ---")
+    resultado = run_load_test(args.sessions, args.iterations, cenarios, args.timeout, args.seed)
+
+    print()
+    # astype(object) mantém as contagens como inteiros na tabela (senão o tabulate recebe tudo como float)
+    print(resultado['resumo'].astype(object).to_markdown(floatfmt=".1f"))
+    print(f"\nInterações: {resultado['interacoes']} ({resultado['interacoes_com_erro']} com erro) em "
+          f"{resultado['duracao_s']:.1f}s ({resultado['vazao_por_s']:.2f}/s sem erro)")
+    print(f"Memória (RSS): pico por sessão {resultado['rss_pico_por_sessao_mb']:.0f} MB, "
+          f"soma dos picos {resultado['rss_pico_total_mb']:.0f} MB (um processo por sessão)")
+    if resultado['erros']:
+        print("\nErros mais frequentes:")
+        for erro, n in resultado['erros'].items():
+            print(f"   - ({n}x) {erro}")
+
+    if args.json:
+        saida = dict(resultado, resumo=resultado['resumo'].reset_index().to_dict(orient='records'))
+        with open(args.json, "w") as f:
+            json.dump(saida, f, indent=2, default=str)
+        print(f"\n-> Resultado gravado em '{args.json}'.")
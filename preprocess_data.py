@@ -1,14 +1,120 @@
 import pandas as pd
 import numpy as np
 import os
+import argparse
+import errno
+import glob
+import hashlib
+import time
+from concurrent.futures import ProcessPoolExecutor
 from sklearn.linear_model import LinearRegression
 from sklearn.preprocessing import MinMaxScaler
 from pathlib import Path
+from src import config
+from src.history_store import write_history_store
+from src.database import write_tables
+from src.analysis.age_sketch import (
+    AGE_MAX, AGE_MIN, AGE_ROUNDING_ERROR, build_age_sketches, merge_age_sketches, summarize_age_sketches
+)
 
-def run_preprocessing():
+def _resolve_sources(source) -> list:
+    """
+    Resolve um arquivo, um diretório (todos os *.csv dentro dele) ou um padrão glob
+    para a lista ordenada de arquivos brutos correspondentes.
+    """
+    path = Path(source)
+    if path.is_dir():
+        files = sorted(path.glob("*.csv"))
+    elif glob.has_magic(str(source)):
+        files = sorted(Path(f) for f in glob.glob(str(source)))
+    else:
+        files = [path]
+
+    if not files or not files[0].exists():
+        raise FileNotFoundError(errno.ENOENT, "Nenhum arquivo bruto encontrado", str(source))
+    return files
+
+def _file_fingerprint(path: Path) -> str:
+    """Calcula a impressão digital (BLAKE2b do conteúdo) de um arquivo bruto."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _cache_key_prefix(path: Path) -> str:
+    """Prefixo de cache exclusivo de um arquivo bruto, derivado do seu caminho absoluto."""
+    return hashlib.blake2b(str(path.resolve()).encode(), digest_size=8).hexdigest()
+
+def _parse_settings_key(date_columns: list) -> str:
+    """Identifica as configurações de leitura e a versão do pandas que geraram um pickle."""
+    settings = f"{sorted(date_columns)}|pandas={pd.__version__}"
+    return hashlib.blake2b(settings.encode(), digest_size=6).hexdigest()
+
+def _parse_source(path: Path, cache_dir, date_columns: list):
+    """
+    Lê um arquivo bruto. Roda em um processo do pool de workers.
+
+    Se `cache_dir` for informado, o DataFrame já tipado é guardado em formato binário (pickle).
+    A chave combina o caminho absoluto do arquivo, as configurações de leitura, a versão do pandas
+    e a impressão digital do conteúdo, de modo que registros inalterados não são lidos de novo.
+    Um pickle ausente ou corrompido é tratado como cache miss.
+
+    Returns:
+        tuple: (path, DataFrame, tempo de leitura em segundos, se veio do cache).
+    """
+    inicio = time.perf_counter()
+    cache_file = None
+    if cache_dir is not None:
+        prefixo = _cache_key_prefix(path)
+        cache_file = Path(cache_dir) / f"{prefixo}-{_parse_settings_key(date_columns)}-{_file_fingerprint(path)}.pkl"
+        try:
+            return path, pd.read_pickle(cache_file), time.perf_counter() - inicio, True
+        except Exception:
+            pass  # Cache ausente, de outra versão ou corrompido: relê o CSV
+
+    df = pd.read_csv(path)
+    for col in date_columns:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors='coerce')
+
+    if cache_file is not None:
+        # Grava em um arquivo temporário e troca de forma atômica, para que nenhum leitor veja um pickle parcial
+        tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        df.to_pickle(tmp_file)
+        os.replace(tmp_file, cache_file)
+        # Remove apenas versões antigas deste mesmo arquivo (mesmo prefixo exato)
+        for antigo in cache_file.parent.glob(f"{prefixo}-*.pkl"):
+            if antigo != cache_file:
+                antigo.unlink(missing_ok=True)
+    return path, df, time.perf_counter() - inicio, False
+
+def _submit_raw_sources(sources: list, date_columns: list, pool: ProcessPoolExecutor, cache_dir) -> list:
+    """Agenda a leitura de cada fonte no pool e devolve os futures, na ordem das fontes."""
+    return [pool.submit(_parse_source, path, cache_dir, date_columns) for path in sources]
+
+def _collect_raw_sources(futures: list) -> pd.DataFrame:
+    """Aguarda as leituras agendadas, reporta tempo/linhas de cada fonte e devolve a união."""
+    frames = []
+    for future in futures:
+        path, df, elapsed, from_cache = future.result()
+        origem = "cache" if from_cache else "csv"
+        print(f"   - {path.name}: {len(df):,} linhas em {elapsed:.2f}s ({origem})")
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+def run_preprocessing(credits_source=None, projects_source=None, max_workers=None, use_cache=True):
     """
     Executa todo o pipeline de processamento de dados, desde os arquivos brutos
     até a criação de todos os arquivos CSV finais necessários para a aplicação Streamlit.
+
+    Args:
+        credits_source: Arquivo, diretório ou padrão glob com os dumps de transações de cada registro.
+                        Padrão: 'data/credits.csv'.
+        projects_source: Arquivo, diretório ou padrão glob com os dumps de projetos de cada registro.
+                         Padrão: 'data/projects.csv'.
+        max_workers (int, optional): Número de processos usados na leitura dos arquivos brutos.
+        use_cache (bool): Se True, reutiliza o cache binário das fontes que não mudaram.
     """
     print("--- INICIANDO PRÉ-PROCESSAMENTO COMPLETO DOS DADOS ---")
 
@@ -19,30 +125,88 @@ def run_preprocessing():
     # Garante que a pasta 'data' exista
     DATA_DIR.mkdir(exist_ok=True)
     
-    RAW_CREDITS_FILE = DATA_DIR / "credits.csv"
-    RAW_PROJECTS_FILE = DATA_DIR / "projects.csv"
+    RAW_CREDITS_SOURCE = credits_source or DATA_DIR / "credits.csv"
+    RAW_PROJECTS_SOURCE = projects_source or DATA_DIR / "projects.csv"
+    RAW_CACHE_DIR = DATA_DIR / ".cache" / "raw"
+
+    cache_dir = None
+    if use_cache:
+        RAW_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        cache_dir = RAW_CACHE_DIR
 
     # --- 1. Carregar e Preparar Dados Brutos ---
     print("\n[1/5] Carregando e limpando dados brutos...")
     try:
-        credits_df = pd.read_csv(RAW_CREDITS_FILE)
-        projects_df = pd.read_csv(RAW_PROJECTS_FILE)
+        credits_files = _resolve_sources(RAW_CREDITS_SOURCE)
+        projects_files = _resolve_sources(RAW_PROJECTS_SOURCE)
     except FileNotFoundError as e:
         print(f"ERRO: Arquivo de dados brutos não encontrado: {e.filename}")
-        print("Por favor, garanta que 'credits.csv' e 'projects.csv' estão na pasta 'data/'.")
+        print("Verifique o arquivo, diretório ou padrão glob informado (padrão: 'credits.csv' e 'projects.csv' na pasta 'data/').")
         return
 
+    # Os dumps de projetos são concatenados do mais antigo para o mais recente (data de modificação),
+    # para que a deduplicação abaixo fique com a versão mais recente de cada projeto
+    projects_files = sorted(projects_files, key=lambda path: path.stat().st_mtime_ns)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        # Agenda todos os arquivos antes de aguardar qualquer um, para o pool não ficar ocioso entre os grupos
+        credits_futures = _submit_raw_sources(credits_files, ['transaction_date'], pool, cache_dir)
+        projects_futures = _submit_raw_sources(projects_files, [], pool, cache_dir)
+        print(f"-> Transações ({len(credits_files)} arquivo(s)):")
+        credits_df = _collect_raw_sources(credits_futures)
+        print(f"-> Projetos ({len(projects_files)} arquivo(s)):")
+        projects_df = _collect_raw_sources(projects_futures)
+
+    # Um mesmo projeto pode aparecer em mais de um dump; mantém a versão do dump mais recente
+    projects_df = projects_df.drop_duplicates(subset='project_id', keep='last')
+    print(f"-> Total: {len(credits_df):,} transações e {len(projects_df):,} projetos.")
+
     merged_df = pd.merge(credits_df, projects_df, on='project_id')
     merged_df['transaction_date'] = pd.to_datetime(merged_df['transaction_date'], errors='coerce')
     merged_df.dropna(subset=['transaction_date'], inplace=True)
+
     merged_df['transaction_year'] = merged_df['transaction_date'].dt.year
-    df_filtrado = merged_df[merged_df['transaction_year'].between(2016, 2024)].copy()
+    df_filtrado = merged_df[merged_df['transaction_year'].between(*config.SCORING_WINDOW)].copy()
     
-    # Salva o arquivo de transações limpas (usado pelo heatmap do dashboard)
     df_aposentados = df_filtrado[df_filtrado['transaction_type'] == 'retirement'].copy()
     df_aposentados['idade_na_aposentadoria'] = df_aposentados['transaction_year'] - df_aposentados['vintage']
     colunas_transacoes = ['country', 'category', 'quantity', 'transaction_year', 'idade_na_aposentadoria']
     df_transacoes_limpas = df_aposentados[colunas_transacoes]
+
+    # Sketches de idade (mergeáveis) por segmento, país e categoria. São validados antes de gravar
+    # qualquer saída, para que uma falha não deixe os arquivos de uma execução pela metade
+    sketches_segmento = build_age_sketches(df_transacoes_limpas, ['country', 'category'])
+    sketches = pd.concat([
+        sketches_segmento.assign(nivel='segmento'),
+        merge_age_sketches(sketches_segmento, ['country']).assign(nivel='pais'),
+        merge_age_sketches(sketches_segmento, ['category']).assign(nivel='categoria'),
+    ], ignore_index=True)
+
+    # Valida a mediana dos sketches contra a mediana exata do pandas: falha se o erro passar do limite
+    # documentado; medianas fora do intervalo do sketch (NaN) são reportadas como aviso
+    resumo = summarize_age_sketches(sketches)
+    for nivel, keys in [('segmento', ['country', 'category']), ('pais', ['country']), ('categoria', ['category'])]:
+        exata = df_transacoes_limpas.groupby(keys)['idade_na_aposentadoria'].median().rename('exata').reset_index()
+        comparacao = pd.merge(resumo[resumo['nivel'] == nivel], exata, on=keys)
+        fora_do_intervalo = comparacao['idade_mediana'].isna() & comparacao['exata'].notna()
+        erro = (comparacao['idade_mediana'] - comparacao['exata']).abs()
+        erro_max = erro.max() if erro.notna().any() else 0.0
+        print(f"   - Sketch de idade ({nivel}): erro máximo da mediana = {erro_max:.2f} ano(s) em {len(comparacao)} grupos.")
+        if fora_do_intervalo.any():
+            print(f"     AVISO: {fora_do_intervalo.sum()} grupo(s) com mediana fora de [{AGE_MIN}, {AGE_MAX}] anos; "
+                  f"o sketch não informa a idade desses grupos.")
+        if erro_max > AGE_ROUNDING_ERROR:
+            piores = comparacao.loc[erro > AGE_ROUNDING_ERROR, keys + ['idade_mediana', 'exata']].head(5)
+            raise ValueError(
+                f"Mediana do sketch de idade ({nivel}) difere da exata em {erro_max:.2f} ano(s), "
+                f"acima do limite de {AGE_ROUNDING_ERROR}:\n{piores.to_string(index=False)}"
+            )
+
+    # Salva o histórico completo por projeto (usado pelo drill-down da calculadora)
+    n_projetos = write_history_store(merged_df, config.PROJECT_HISTORY_FILE, config.PROJECT_HISTORY_INDEX_FILE)
+    print(f"-> '{config.PROJECT_HISTORY_FILE.name}' e '{config.PROJECT_HISTORY_INDEX_FILE.name}' gerados ({n_projetos} projetos).")
+
+    # Salva o arquivo de transações limpas (usado pelo heatmap do dashboard)
     df_transacoes_limpas.to_csv(DATA_DIR / "dados_limpos_para_regressao.csv", index=False)
     print("-> 'dados_limpos_para_regressao.csv' gerado.")
 
@@ -88,6 +252,9 @@ def run_preprocessing():
     df_segments.to_csv(DATA_DIR / "indice_alinhamento_segmentos.csv", index=False)
     print("-> 'indice_alinhamento_segmentos.csv' gerado com todas as colunas.")
 
+    sketches.to_csv(config.AGE_SKETCHES_FILE, index=False)
+    print(f"-> '{config.AGE_SKETCHES_FILE.name}' gerado.")
+
     # --- 4. Calcular o Relatório de Oportunidades com Score ---
     print("\n[4/5] Calculando o 'Score de Oportunidade' para cada projeto...")
     total_emitido = df_filtrado[df_filtrado['transaction_type'] == 'issuance'].groupby('project_id')['quantity'].sum()
@@ -126,7 +293,28 @@ def run_preprocessing():
     #... (lógica de perfil pode ser adicionada aqui se necessário, mas os componentes atuais do dashboard já a fazem)
     # Por agora, vamos garantir que o dashboard funcione. O erro era nele.
 
+    # Banco SQLite com as saídas do pipeline (paginação da aba de visualização de dados)
+    write_tables(config.DATABASE_FILE, {
+        'oportunidades': df_opps,
+        'indice_alinhamento': df_segments,
+        'transacoes': df_transacoes_limpas,
+        'projetos': projects_df,
+    })
+    print(f"-> '{config.DATABASE_FILE.name}' gerado.")
+
     print("\n--- PRÉ-PROCESSAMENTO CONCLUÍDO COM SUCESSO ---")
 
 if __name__ == "__main__":
-    run_preprocessing()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Pipeline de pré-processamento dos dados de carbono.")
+    parser.add_argument("--credits", help="Arquivo, diretório ou glob com os dumps de transações (padrão: data/credits.csv).")
+    parser.add_argument("--projects", help="Arquivo, diretório ou glob com os dumps de projetos (padrão: data/projects.csv).")
+    parser.add_argument("--workers", type=int, default=None, help="Número de processos de leitura (padrão: nº de CPUs).")
+    parser.add_argument("--no-cache", action="store_true", help="Ignora o cache binário e relê todos os arquivos brutos.")
+    args = parser.parse_args()
+
+    run_preprocessing(
+        credits_source=args.credits,
+        projects_source=args.projects,
+        max_workers=args.workers,
+        use_cache=not args.no_cache
+    )
\ No newline at end of file
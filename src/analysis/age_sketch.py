@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+from typing import List, Sequence
+
+# Sketch de quantis da idade dos créditos na aposentadoria.
+#
+# Cada sketch é um histograma de contagens com bins de 1 ano no intervalo [AGE_MIN, AGE_MAX], mais
+# dois buckets separados para idades abaixo e acima desse intervalo (ex.: vintage posterior ao ano da
+# aposentadoria gera idade negativa). Ele tem tamanho fixo, pode ser atualizado incrementalmente e
+# dois sketches (de shards, partições ou períodos diferentes) são combinados somando as contagens.
+#
+# Limites de erro: para idades inteiras (diferença entre dois anos) os quantis são iguais aos do
+# pandas (interpolação linear) sempre que as posições usadas caem dentro de [AGE_MIN, AGE_MAX]. Para
+# idades não inteiras o erro é de no máximo AGE_ROUNDING_ERROR (arredondamento ao bin). Se o quantil
+# cai em um dos buckets externos, o valor exato não é conhecido e o resultado é NaN — nunca um valor
+# "grudado" na borda do intervalo.
+AGE_MIN, AGE_MAX = -10, 60
+AGE_ROUNDING_ERROR = 0.5
+AGE_COLUMNS = [f"idade_{idade}" for idade in range(AGE_MIN, AGE_MAX + 1)]
+SKETCH_COLUMNS = ['idade_abaixo'] + AGE_COLUMNS + ['idade_acima']
+SKETCH_QUANTILES = {'idade_p10': 0.10, 'idade_mediana': 0.50, 'idade_p90': 0.90}
+
+
+def build_age_sketches(df: pd.DataFrame, keys: List[str], age_column: str = 'idade_na_aposentadoria') -> pd.DataFrame:
+    """
+    Constrói um sketch de idade para cada grupo definido por `keys`.
+
+    Args:
+        df (pd.DataFrame): Transações de aposentadoria com a coluna de idade.
+        keys (List[str]): Colunas que definem o grupo (ex.: ['country', 'category']).
+        age_column (str): Coluna com a idade do crédito na aposentadoria.
+
+    Returns:
+        pd.DataFrame: Uma linha por grupo com as colunas de `keys` e as contagens de SKETCH_COLUMNS.
+    """
+    df_validos = df.dropna(subset=[age_column])
+    # Posição 0 = abaixo do intervalo, 1..n = idades AGE_MIN..AGE_MAX, n + 1 = acima do intervalo
+    idades = np.rint(df_validos[age_column].to_numpy(dtype=float))
+    bins = np.clip(idades - AGE_MIN + 1, 0, len(AGE_COLUMNS) + 1).astype(int)
+
+    contagens = (
+        df_validos[keys].assign(_bin=bins)
+        .groupby(keys + ['_bin']).size()
+        .unstack('_bin', fill_value=0)
+        .reindex(columns=range(len(SKETCH_COLUMNS)), fill_value=0)
+    )
+    contagens.columns = SKETCH_COLUMNS
+    return contagens.reset_index()
+
+
+def merge_age_sketches(df_sketches: pd.DataFrame, keys: List[str]) -> pd.DataFrame:
+    """
+    Combina sketches somando as contagens por `keys`.
+
+    Serve tanto para agregar níveis (segmento -> país) quanto para unir sketches de shards
+    diferentes concatenados com pd.concat.
+    """
+    return df_sketches.groupby(keys, dropna=False)[SKETCH_COLUMNS].sum().reset_index()
+
+
+def sketch_quantiles(counts: np.ndarray, quantiles: Sequence[float]) -> np.ndarray:
+    """
+    Calcula quantis a partir de uma matriz de contagens (um sketch por linha).
+
+    Usa a mesma interpolação linear do pandas entre as posições floor/ceil de q * (n - 1).
+
+    Returns:
+        np.ndarray: Matriz (n_sketches x n_quantis). Sketches vazios, ou quantis que dependem
+                    de um bucket fora do intervalo, retornam NaN.
+    """
+    counts = np.atleast_2d(counts)
+    acumulado = counts.cumsum(axis=1)
+    n = acumulado[:, -1]
+    # Os buckets externos não têm um valor conhecido
+    valores = np.concatenate([[np.nan], np.arange(AGE_MIN, AGE_MAX + 1, dtype=float), [np.nan]])
+
+    def valor_na_posicao(posicao: np.ndarray) -> np.ndarray:
+        # Primeiro bin cuja contagem acumulada ultrapassa a posição (0-indexada)
+        return valores[(acumulado > posicao[:, None]).argmax(axis=1)]
+
+    resultado = np.full((len(counts), len(quantiles)), np.nan)
+    for j, q in enumerate(quantiles):
+        posicao = q * np.maximum(n - 1, 0)
+        baixo, alto = np.floor(posicao), np.ceil(posicao)
+        v_baixo, v_alto = valor_na_posicao(baixo), valor_na_posicao(alto)
+        # Sem fração, só a posição inferior importa (evita propagar o NaN de um bucket externo vizinho)
+        resultado[:, j] = np.where(posicao == baixo, v_baixo, v_baixo + (posicao - baixo) * (v_alto - v_baixo))
+    resultado[n == 0] = np.nan
+    return resultado
+
+
+def summarize_age_sketches(df_sketches: pd.DataFrame) -> pd.DataFrame:
+    """
+    Adiciona ao DataFrame de sketches as colunas 'n_transacoes', 'idade_p10', 'idade_mediana' e 'idade_p90'.
+    """
+    counts = df_sketches[SKETCH_COLUMNS].to_numpy()
+    quantis = sketch_quantiles(counts, list(SKETCH_QUANTILES.values()))
+
+    df_resumo = df_sketches.drop(columns=SKETCH_COLUMNS).copy()
+    df_resumo['n_transacoes'] = counts.sum(axis=1)
+    for j, coluna in enumerate(SKETCH_QUANTILES):
+        df_resumo[coluna] = quantis[:, j]
+    return df_resumo
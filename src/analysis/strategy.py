@@ -1,8 +1,10 @@
 import pandas as pd
+from typing import Optional
 
-def get_investment_thesis(df_alignment: pd.DataFrame, country: str, category: str):
+def get_investment_thesis(df_alignment: pd.DataFrame, country: str, category: str, df_age_sketches: Optional[pd.DataFrame] = None):
     """
     Gera um dossiê de investimento para uma combinação de país e categoria.
+    Se os sketches de idade forem informados, a justificativa de idade inclui a dispersão (p10-p90).
     """
     try:
         # Encontra a linha específica para a combinação selecionada
@@ -19,6 +21,20 @@ def get_investment_thesis(df_alignment: pd.DataFrame, country: str, category: st
             f"**Tendência de Crescimento:** O volume deste segmento mostra uma tendência de crescimento com um coeficiente de **{int(segment_data['growth_trend']):,}**.",
             f"**Perfil de Idade:** A idade mediana dos créditos neste segmento é de **{segment_data['idade_na_aposentadoria']:.1f} anos**."
         ]
+
+        if df_age_sketches is not None:
+            sketch = df_age_sketches[
+                (df_age_sketches['nivel'] == 'segmento') &
+                (df_age_sketches['country'] == country) &
+                (df_age_sketches['category'] == category)
+            ]
+            # p10/p90 ficam NaN quando caem fora do intervalo coberto pelo sketch
+            if not sketch.empty and sketch[['idade_p10', 'idade_p90']].notna().all(axis=None):
+                sketch = sketch.iloc[0]
+                justifications.append(
+                    f"**Dispersão de Idade:** 80% das aposentadorias usam créditos entre **{sketch['idade_p10']:.0f}** e "
+                    f"**{sketch['idade_p90']:.0f} anos** (p10-p90, {int(sketch['n_transacoes']):,} transações)."
+                )
         
         return {"score": score, "justifications": justifications}
 
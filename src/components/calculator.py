@@ -4,6 +4,8 @@ import streamlit as st
 import pandas as pd
 from ..analysis import strategy
 from ..visuals import charts
+from ..data_loader import load_project_history, load_age_sketches
+from ..utils.custom_exceptions import DataFileNotFoundError
 
 def render_calculator(df_alignment: pd.DataFrame, df_opps: pd.DataFrame):
     """Renderiza a interface do Consultor Estratégico Interativo com layout aprimorado."""
@@ -57,7 +59,7 @@ def render_calculator(df_alignment: pd.DataFrame, df_opps: pd.DataFrame):
             st.header(f"Dossiê: {st.session_state.selected_category} em {st.session_state.selected_country}")
             
             try:
-                thesis = strategy.get_investment_thesis(df_alignment, st.session_state.selected_country, st.session_state.selected_category)
+                thesis = strategy.get_investment_thesis(df_alignment, st.session_state.selected_country, st.session_state.selected_category, load_age_sketches())
                 segment_data_row = df_alignment[(df_alignment['country'] == st.session_state.selected_country) & (df_alignment['category'] == st.session_state.selected_category)].iloc[0]
 
                 # --- MUDANÇA: ORGANIZANDO OS GRÁFICOS EM COLUNAS ---
@@ -81,6 +83,23 @@ def render_calculator(df_alignment: pd.DataFrame, df_opps: pd.DataFrame):
                     st.warning("Não foram encontrados projetos com créditos disponíveis para este segmento.")
                 else:
                     st.dataframe(project_results[['name', 'status', 'volume_disponivel', 'opportunity_score']], hide_index=True, use_container_width=True)
+
+                    # Drill-down: histórico de emissões/aposentadorias do projeto escolhido
+                    projetos = dict(zip(project_results['project_id'], project_results['name']))
+                    project_id = st.selectbox(
+                        "Ver histórico de transações do projeto",
+                        options=list(projetos),
+                        format_func=lambda pid: f"{projetos[pid]} ({pid})",
+                        key="sb_project_history"
+                    )
+                    try:
+                        df_history = load_project_history(project_id)
+                        if df_history.empty:
+                            st.info("Não há transações registradas para este projeto.")
+                        else:
+                            st.plotly_chart(charts.create_project_timeline_chart(df_history, projetos[project_id]), use_container_width=True)
+                    except DataFileNotFoundError as e:
+                        st.info(f"Histórico por projeto indisponível: {e}")
             except (IndexError, KeyError):
                  st.error("Não foi possível gerar a análise para o segmento selecionado. Pode haver dados insuficientes.")
         else:
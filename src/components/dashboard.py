@@ -1,8 +1,10 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
+from ..analysis import opportunities
 from ..visuals import charts 
 
-def render_dashboard(df_country: pd.DataFrame, df_category: pd.DataFrame, df_analise_completa: pd.DataFrame):
+def render_dashboard(df_country: pd.DataFrame, df_category: pd.DataFrame, df_analise_completa: pd.DataFrame, df_opps: pd.DataFrame):
     """
     Renderiza o painel de inteligência de mercado no Streamlit.
 
@@ -11,6 +13,7 @@ def render_dashboard(df_country: pd.DataFrame, df_category: pd.DataFrame, df_ana
         df_category (pd.DataFrame): DataFrame com o perfil por categoria.
         df_analise_completa (pd.DataFrame): O DataFrame com todas as transações de aposentadoria.
                                             Usado para o mapa de calor.
+        df_opps (pd.DataFrame): O relatório de oportunidades com score. Usado para o mapa de oportunidades.
     """
     st.header("Visão Geral do Mercado de Aposentadorias (2016-2024)")
     st.markdown("Esta seção apresenta insights sobre os principais mercados e categorias de projetos de carbono.")
@@ -63,4 +66,43 @@ def render_dashboard(df_country: pd.DataFrame, df_category: pd.DataFrame, df_ana
         top_countries=top_paises,
         top_categories=top_categorias
     )
-    st.plotly_chart(fig_heatmap, use_container_width=True)
\ No newline at end of file
+    st.plotly_chart(fig_heatmap, use_container_width=True)
+
+    # --- Seção 4: Mapa de Oportunidades ---
+    st.subheader("🔎 Mapa de Oportunidades por Projeto")
+    st.caption(
+        "Com muitos projetos o mapa é agregado em uma grade (cor = score médio). "
+        "Use os filtros e os intervalos abaixo para dar zoom; com poucos projetos cada um vira um ponto."
+    )
+
+    col5, col6 = st.columns(2)
+    with col5:
+        paises = st.multiselect("Países", options=sorted(df_opps['country'].dropna().unique()), key="opps_countries")
+    with col6:
+        categorias = st.multiselect("Categorias", options=sorted(df_opps['category'].dropna().unique()), key="opps_categories")
+    df_mapa = opportunities.filter_opportunities(df_opps, paises, categorias, min_volume=0)
+
+    if df_mapa.empty:
+        st.info("Nenhum projeto corresponde aos filtros selecionados.")
+        return
+
+    # Zoom: intervalos de idade e de volume (em escala log10) repassados ao gráfico
+    idade_min, idade_max = float(df_mapa['idade_estimada'].min()), float(df_mapa['idade_estimada'].max())
+    log_min = float(np.log10(df_mapa['volume_disponivel'].clip(lower=1).min()))
+    log_max = float(np.log10(df_mapa['volume_disponivel'].clip(lower=1).max()))
+
+    idade_max, log_max = max(idade_max, idade_min + 1), max(log_max, log_min + 0.1)
+
+    col7, col8 = st.columns(2)
+    with col7:
+        age_range = st.slider("Idade estimada (anos)", idade_min, idade_max, (idade_min, idade_max), step=1.0, key="opps_age_range")
+    with col8:
+        log_range = st.slider("Volume disponível (10^x créditos)", log_min, log_max, (log_min, log_max), step=0.1, format="10^%.1f", key="opps_volume_range")
+
+    # Intervalo completo = sem zoom (evita perder os extremos por arredondamento do log)
+    fig_oportunidades = charts.create_opportunity_scatter_plot(
+        df_mapa,
+        age_range=None if age_range == (idade_min, idade_max) else age_range,
+        volume_range=None if log_range == (log_min, log_max) else (10 ** log_range[0], 10 ** log_range[1])
+    )
+    st.plotly_chart(fig_oportunidades, use_container_width=True)
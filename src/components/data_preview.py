@@ -2,12 +2,127 @@ import streamlit as st
 import pandas as pd
 import os
 from pathlib import Path
+from .. import config, database
+from ..utils.custom_exceptions import InvalidFilterError
+
+FILTER_COLUMNS = ['country', 'category', 'status']
+PAGE_SIZE_OPTIONS = [25, 50, 100, 500]
+ALL_OPTION = "Todos"
+ORIGINAL_ORDER_OPTION = "(ordem original)"
 
 def render_data_preview():
     """
-    Renderiza a visualização das primeiras 20 linhas de cada DataFrame da pasta data.
+    Renderiza a visualização dos dados. Se o banco SQLite do pipeline existir, as tabelas completas
+    podem ser navegadas com filtros, ordenação e paginação feitos no banco; caso contrário, mostra
+    as primeiras 20 linhas de cada arquivo CSV da pasta data.
     """
     st.header("📋 Visualização dos Dados")
+
+    if config.DATABASE_FILE.exists():
+        _render_database_preview()
+    else:
+        _render_csv_preview()
+
+def _render_database_preview():
+    """Renderiza uma aba por tabela do banco SQLite, cada uma com seu navegador paginado."""
+    st.write(
+        "Navegue pelas tabelas completas geradas pelo pipeline. Filtros, ordenação e paginação "
+        "são feitos no banco SQLite, então cada página carrega apenas as suas linhas."
+    )
+
+    conn = database.connect(config.DATABASE_FILE)
+    try:
+        tables = database.list_tables(conn)
+        if not tables:
+            st.warning("O banco de dados não contém tabelas.")
+            return
+
+        tabs = st.tabs([f"🗄️ {table}" for table in tables])
+        for i, table in enumerate(tables):
+            with tabs[i]:
+                try:
+                    _render_table_browser(conn, table)
+                except InvalidFilterError as e:
+                    st.error(f"Filtro inválido: {e}")
+    finally:
+        conn.close()
+
+def _render_table_browser(conn, table: str):
+    """
+    Renderiza os controles de filtro/ordenação e a página atual de uma tabela.
+
+    A paginação é por keyset: o session_state guarda o cursor do início de cada página visitada,
+    e a pilha é reiniciada sempre que os filtros ou a ordenação mudam.
+    """
+    columns = database.list_columns(conn, table)
+
+    # --- Filtros e ordenação ---
+    filters = {}
+    filter_columns = [c for c in FILTER_COLUMNS if c in columns]
+    controls = st.columns(len(filter_columns) + 1) if filter_columns else [st.container()]
+    for i, column in enumerate(filter_columns):
+        with controls[i]:
+            options = [ALL_OPTION] + database.distinct_values(conn, table, column)
+            value = st.selectbox(column, options=options, key=f"preview_{table}_{column}")
+            if value != ALL_OPTION:
+                filters[column] = value
+
+    min_score = None
+    with controls[-1]:
+        if 'opportunity_score' in columns:
+            min_score = st.slider("Score mínimo", 0.0, 1.0, 0.0, 0.05, key=f"preview_{table}_min_score")
+            min_score = min_score if min_score > 0 else None
+
+    col_order, col_desc, col_size = st.columns((2, 1, 1))
+    with col_order:
+        # Só colunas indexadas: ordenar por outra coluna faria o SQLite ordenar a tabela inteira a cada página
+        sort_columns = [c for c in database.INDEXED_COLUMNS if c in columns]
+        default_order = sort_columns.index('opportunity_score') + 1 if 'opportunity_score' in sort_columns else 0
+        order_by = st.selectbox("Ordenar por", options=[ORIGINAL_ORDER_OPTION] + sort_columns, index=default_order, key=f"preview_{table}_order")
+        order_by = None if order_by == ORIGINAL_ORDER_OPTION else order_by
+    with col_desc:
+        descending = st.checkbox("Decrescente", value=order_by == 'opportunity_score', key=f"preview_{table}_desc")
+    with col_size:
+        page_size = st.selectbox("Linhas por página", options=PAGE_SIZE_OPTIONS, index=1, key=f"preview_{table}_size")
+
+    # --- Estado da paginação ---
+    state_key = f"preview_{table}_cursors"
+    signature = (tuple(sorted(filters.items())), min_score, order_by, descending, page_size)
+    if st.session_state.get(f"{state_key}_signature") != signature:
+        st.session_state[f"{state_key}_signature"] = signature
+        st.session_state[state_key] = [None]
+    cursors = st.session_state[state_key]
+
+    total = database.count_rows(conn, table, filters=filters, min_score=min_score)
+    page, next_cursor = database.fetch_page(
+        conn, table, order_by=order_by, descending=descending,
+        filters=filters, min_score=min_score, limit=page_size, after=cursors[-1]
+    )
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Linhas Filtradas", f"{total:,}")
+    with col2:
+        st.metric("Página", f"{len(cursors)} de {max(1, -(-total // page_size)):,}")
+    with col3:
+        st.metric("Total de Colunas", len(columns))
+
+    st.dataframe(page, use_container_width=True, hide_index=True)
+
+    col_prev, col_next = st.columns(2)
+    with col_prev:
+        if st.button("⬅️ Anterior", disabled=len(cursors) == 1, use_container_width=True, key=f"preview_{table}_prev"):
+            cursors.pop()
+            st.rerun()
+    with col_next:
+        if st.button("Próxima ➡️", disabled=next_cursor is None, use_container_width=True, key=f"preview_{table}_next"):
+            cursors.append(next_cursor)
+            st.rerun()
+
+def _render_csv_preview():
+    """
+    Renderiza a visualização das primeiras 20 linhas de cada DataFrame da pasta data.
+    """
     st.write("Esta seção mostra as primeiras 20 linhas de cada arquivo CSV da pasta data.")
     
     # Caminho para a pasta data
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -6,8 +7,30 @@ DATA_DIR = BASE_DIR / "data"
 # Arquivos para a Calculadora / Consultor Estratégico
 ALIGNMENT_INDEX_FILE = DATA_DIR / "indice_alinhamento_segmentos.csv"
 OPPORTUNITIES_SCORED_FILE = DATA_DIR / "relatorio_oportunidades_com_score.csv"
+AGE_SKETCHES_FILE = DATA_DIR / "sketches_idade_segmentos.csv" # Sketches de quantis da idade (opcional)
 
 # Arquivos para o Dashboard
 COUNTRY_PROFILE_FILE = DATA_DIR / "perfil_mercado_por_pais.csv"
 CATEGORY_PROFILE_FILE = DATA_DIR / "perfil_mercado_por_categoria.csv"
-TRANSACTIONS_FILE = DATA_DIR / "dados_limpos_para_regressao.csv" # Usado pelo Heatmap
\ No newline at end of file
+TRANSACTIONS_FILE = DATA_DIR / "dados_limpos_para_regressao.csv" # Usado pelo Heatmap
+
+# Janela de anos usada no score de oportunidade e no índice de alinhamento
+SCORING_WINDOW = (2016, 2024)
+
+# Histórico de transações por projeto (drill-down da Calculadora)
+PROJECT_HISTORY_FILE = DATA_DIR / "historico_transacoes_por_projeto.npy"
+PROJECT_HISTORY_INDEX_FILE = DATA_DIR / "indice_historico_por_projeto.csv"
+
+# Banco SQLite com as saídas do pipeline (aba de Visualização dos Dados)
+DATABASE_FILE = DATA_DIR / "becarbon.sqlite"
+
+# Memória compartilhada entre processos do Streamlit (ver src/shared_data.py)
+SHARED_MEMORY_ENABLED = os.environ.get("BECARBON_SHARED_MEMORY") == "1"
+SHARED_MEMORY_MANIFEST_FILE = Path(os.environ.get("BECARBON_SHARED_MEMORY_MANIFEST", DATA_DIR / "shared_memory_manifest.json"))
+SHARED_DATASETS = {
+    "alignment": ALIGNMENT_INDEX_FILE,
+    "opportunities": OPPORTUNITIES_SCORED_FILE,
+    "country_profile": COUNTRY_PROFILE_FILE,
+    "category_profile": CATEGORY_PROFILE_FILE,
+    "transactions": TRANSACTIONS_FILE,
+}
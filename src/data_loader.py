@@ -1,11 +1,33 @@
 import streamlit as st
 import pandas as pd
 from . import config
-from .utils.custom_exceptions import DataFileNotFoundError
+from . import history_store
+from . import shared_data
+from .analysis.age_sketch import summarize_age_sketches
+from .utils.custom_exceptions import DataFileNotFoundError, HistoryStoreMismatchError
 
-@st.cache_data
 def load_all_data():
-    """Carrega todos os 5 DataFrames necessários para a aplicação."""
+    """
+    Carrega todos os 5 DataFrames necessários para a aplicação.
+
+    Com BECARBON_SHARED_MEMORY=1, anexa os datasets publicados em memória compartilhada
+    (`python -m src.shared_data publish`) em vez de manter uma cópia por processo.
+    Se nada foi publicado, volta a carregar do disco.
+    """
+    if config.SHARED_MEMORY_ENABLED:
+        try:
+            manifest = shared_data.read_manifest()
+            datasets = _load_from_shared_memory(manifest['version'], manifest)
+            # max_entries=1 já descartou a versão anterior do cache; agora seus segmentos podem ser fechados
+            shared_data.release_stale(manifest['version'])
+            return datasets
+        except FileNotFoundError:
+            print("Datasets não publicados em memória compartilhada; carregando do disco.")
+    return _load_from_disk()
+
+@st.cache_data
+def _load_from_disk():
+    """Carrega os 5 DataFrames dos arquivos CSV."""
     try:
         # Carrega os arquivos
         df_alignment = pd.read_csv(config.ALIGNMENT_INDEX_FILE)
@@ -20,4 +42,49 @@ def load_all_data():
         return df_alignment, df_opps_scored, df_country_profile, df_category_profile, df_transactions
 
     except FileNotFoundError as e:
-        raise DataFileNotFoundError(f"Arquivo de dados não encontrado: {e.filename}. Verifique a pasta 'data/'.")
\ No newline at end of file
+        raise DataFileNotFoundError(f"Arquivo de dados não encontrado: {e.filename}. Verifique a pasta 'data/'.")
+
+@st.cache_resource(max_entries=1)
+def _load_from_shared_memory(version: str, _manifest: dict):
+    """
+    Anexa os DataFrames publicados em memória compartilhada (somente leitura, sem cópia).
+    Usa cache_resource porque cache_data copiaria os arrays para cada sessão. A versão é a chave
+    do cache (o manifesto não entra no hash): uma nova publicação é anexada no próximo rerun e,
+    com max_entries=1, a versão anterior sai do cache.
+    """
+    datasets = shared_data.attach(_manifest)
+    print(f"Dados anexados da memória compartilhada (versão {version}).")
+    return tuple(datasets[name] for name in config.SHARED_DATASETS)
+
+@st.cache_data
+def load_age_sketches():
+    """
+    Carrega os sketches de idade gerados pelo pipeline, já com p10, mediana e p90.
+    Retorna None se o arquivo ainda não foi gerado, pois o dossiê funciona sem ele.
+    """
+    try:
+        return summarize_age_sketches(pd.read_csv(config.AGE_SKETCHES_FILE))
+    except FileNotFoundError:
+        return None
+
+@st.cache_resource(max_entries=1)
+def load_project_history_store(version: tuple):
+    """
+    Abre o armazenamento de histórico por projeto (memory-mapped) uma única vez por versão.
+    Usa cache_resource porque o memmap não deve ser serializado/copiado a cada sessão. A versão
+    (inode/tamanho/mtime dos dois arquivos) faz registros e índice serem recarregados juntos
+    quando o pipeline roda de novo; max_entries=1 descarta o mapeamento anterior.
+    """
+    return history_store.open_history_store(config.PROJECT_HISTORY_FILE, config.PROJECT_HISTORY_INDEX_FILE)
+
+
+def load_project_history(project_id: str) -> pd.DataFrame:
+    """Retorna o histórico de emissões e aposentadorias de um único projeto."""
+    try:
+        version = history_store.store_version(config.PROJECT_HISTORY_FILE, config.PROJECT_HISTORY_INDEX_FILE)
+        records, index = load_project_history_store(version)
+    except FileNotFoundError as e:
+        raise DataFileNotFoundError(f"Arquivo de histórico não encontrado: {e.filename}. Execute 'preprocess_data.py'.")
+    except HistoryStoreMismatchError as e:
+        raise DataFileNotFoundError(str(e))
+    return history_store.read_project_history(records, index, project_id)
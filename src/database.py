@@ -0,0 +1,181 @@
+import sqlite3
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from .utils.custom_exceptions import InvalidFilterError
+
+# Colunas indexadas em todas as tabelas que as possuem (filtros e ordenação da visualização de dados)
+INDEXED_COLUMNS = ['country', 'category', 'status', 'opportunity_score']
+
+
+def write_tables(db_path: Path, tables: Dict[str, pd.DataFrame]) -> None:
+    """
+    Grava os DataFrames do pipeline no banco SQLite, substituindo as tabelas existentes,
+    e cria os índices das colunas de filtro/ordenação.
+
+    Args:
+        db_path (Path): Caminho do arquivo SQLite.
+        tables (Dict[str, pd.DataFrame]): Mapeamento nome da tabela -> DataFrame.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        with conn:
+            for table, df in tables.items():
+                df.to_sql(table, conn, if_exists='replace', index=False, chunksize=50_000)
+                for column in INDEXED_COLUMNS:
+                    if column in df.columns:
+                        conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_{table}_{column}" ON "{table}" ("{column}")')
+            conn.execute("ANALYZE")
+        # Fora da transação: recupera o espaço das tabelas substituídas
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+
+def connect(db_path: Path) -> sqlite3.Connection:
+    """Abre o banco em modo somente leitura."""
+    if not Path(db_path).exists():
+        raise FileNotFoundError(2, "Banco de dados não encontrado", str(db_path))
+    # as_uri() escapa '?', '#' e '%' do caminho
+    return sqlite3.connect(Path(db_path).resolve().as_uri() + "?mode=ro", uri=True, check_same_thread=False)
+
+
+def list_tables(conn: sqlite3.Connection) -> List[str]:
+    rows = conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name")
+    return [row[0] for row in rows]
+
+
+def list_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    if table not in list_tables(conn):
+        raise InvalidFilterError(f"Tabela inválida: {table}")
+    return [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+
+
+def distinct_values(conn: sqlite3.Connection, table: str, column: str, limit: int = 500) -> list:
+    """Valores distintos de uma coluna (usa o índice quando a coluna é indexada)."""
+    _check_columns(conn, table, [column])
+    rows = conn.execute(
+        f'SELECT DISTINCT "{column}" FROM "{table}" WHERE "{column}" IS NOT NULL ORDER BY 1 LIMIT ?', (limit,)
+    )
+    return [row[0] for row in rows]
+
+
+def _check_columns(conn: sqlite3.Connection, table: str, columns: List[str]) -> None:
+    """Garante que tabela e colunas existem antes de interpolá-las no SQL."""
+    validas = list_columns(conn, table)
+    for column in columns:
+        if column not in validas:
+            raise InvalidFilterError(f"Coluna inválida para '{table}': {column}")
+
+
+def _where_clause(filters: Dict[str, object], min_score: Optional[float]) -> Tuple[List[str], list]:
+    conditions, params = [], []
+    for column, value in filters.items():
+        conditions.append(f'"{column}" = ?')
+        params.append(value)
+    if min_score is not None:
+        conditions.append('"opportunity_score" >= ?')
+        params.append(min_score)
+    return conditions, params
+
+
+def count_rows(
+    conn: sqlite3.Connection,
+    table: str,
+    filters: Optional[Dict[str, object]] = None,
+    min_score: Optional[float] = None
+) -> int:
+    """Conta as linhas que atendem aos filtros."""
+    filters = filters or {}
+    _check_columns(conn, table, list(filters) + (['opportunity_score'] if min_score is not None else []))
+    conditions, params = _where_clause(filters, min_score)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return conn.execute(f'SELECT COUNT(*) FROM "{table}" {where}', params).fetchone()[0]
+
+
+def fetch_page(
+    conn: sqlite3.Connection,
+    table: str,
+    order_by: Optional[str] = None,
+    descending: bool = False,
+    filters: Optional[Dict[str, object]] = None,
+    min_score: Optional[float] = None,
+    limit: int = 50,
+    offset: int = 0,
+    after: Optional[Tuple[object, int]] = None
+) -> Tuple[pd.DataFrame, Optional[Tuple[object, int]]]:
+    """
+    Busca uma página de uma tabela com filtros e ordenação feitos pelo SQLite.
+
+    A paginação pode ser por offset (`offset`) ou por keyset (`after`). O keyset usa o par
+    (valor da coluna de ordenação, rowid) da última linha da página anterior, então o custo de
+    cada página não cresce com a posição na tabela.
+
+    Args:
+        conn (sqlite3.Connection): Conexão aberta com `connect`.
+        table (str): Nome da tabela.
+        order_by (str, optional): Coluna de ordenação. Se None, ordena pelo rowid.
+        descending (bool): Ordem decrescente.
+        filters (Dict[str, object], optional): Filtros de igualdade coluna -> valor.
+        min_score (float, optional): Score mínimo de oportunidade.
+        limit (int): Número de linhas da página.
+        offset (int): Deslocamento (ignorado quando `after` é informado).
+        after (Tuple[object, int], optional): Cursor retornado pela página anterior.
+
+    Returns:
+        Tuple[pd.DataFrame, Optional[Tuple[object, int]]]: A página e o cursor para a próxima (None no fim).
+    """
+    filters = filters or {}
+    columns = list(filters) + (['opportunity_score'] if min_score is not None else [])
+    if order_by is not None:
+        columns.append(order_by)
+    _check_columns(conn, table, columns)
+
+    conditions, params = _where_clause(filters, min_score)
+    sort_expr = f'"{order_by}"' if order_by is not None else "rowid"
+    direction = "DESC" if descending else "ASC"
+
+    if after is not None:
+        last_value, last_rowid = after
+        keyset, keyset_params = _keyset_condition(sort_expr, order_by is not None, descending, last_value, last_rowid)
+        conditions.append(keyset)
+        params.extend(keyset_params)
+        offset = 0
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    order = f"{sort_expr} {direction}, rowid {direction}" if order_by is not None else f"rowid {direction}"
+    query = f'SELECT rowid AS _rowid, {sort_expr} AS _sort, * FROM "{table}" {where} ORDER BY {order} LIMIT ? OFFSET ?'
+
+    # Busca uma linha a mais apenas para saber se existe uma próxima página
+    df = pd.read_sql_query(query, conn, params=params + [limit + 1, offset])
+    has_next = len(df) > limit
+    df = df.iloc[:limit]
+    cursor = None
+    if has_next:
+        cursor = (df['_sort'].iloc[-1], int(df['_rowid'].iloc[-1]))
+        if pd.isna(cursor[0]):
+            cursor = (None, cursor[1])
+        elif hasattr(cursor[0], 'item'):
+            cursor = (cursor[0].item(), cursor[1])
+    return df.drop(columns=['_rowid', '_sort']), cursor
+
+
+def _keyset_condition(sort_expr: str, has_column: bool, descending: bool, last_value, last_rowid: int) -> Tuple[str, list]:
+    """
+    Monta a condição "depois da última linha" para a paginação por keyset.
+    No SQLite os NULLs vêm primeiro em ASC e por último em DESC, e o rowid desempata.
+    """
+    if not has_column:
+        return ("rowid < ?" if descending else "rowid > ?"), [last_rowid]
+
+    if descending:
+        if last_value is None:
+            return f"({sort_expr} IS NULL AND rowid < ?)", [last_rowid]
+        return (
+            f"({sort_expr} < ? OR ({sort_expr} = ? AND rowid < ?) OR {sort_expr} IS NULL)",
+            [last_value, last_value, last_rowid]
+        )
+
+    if last_value is None:
+        return f"(({sort_expr} IS NULL AND rowid > ?) OR {sort_expr} IS NOT NULL)", [last_rowid]
+    return f"({sort_expr} > ? OR ({sort_expr} = ? AND rowid > ?))", [last_value, last_value, last_rowid]
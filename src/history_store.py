@@ -0,0 +1,102 @@
+import os
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from .utils.custom_exceptions import HistoryStoreMismatchError
+
+# Códigos numéricos para o tipo de transação. Tipos desconhecidos são gravados como -1.
+TRANSACTION_TYPE_CODES = {"issuance": 0, "retirement": 1}
+TRANSACTION_TYPE_LABELS = {0: "Emissão", 1: "Aposentadoria", -1: "Outro"}
+
+# Layout binário de cada transação no armazenamento. Registros de tamanho fixo permitem
+# que o histórico de um projeto seja lido como uma fatia contígua via memory mapping.
+HISTORY_DTYPE = np.dtype([
+    ("transaction_date", "M8[D]"),
+    ("transaction_type", "i1"),
+    ("quantity", "f8"),
+    ("vintage", "f8"),
+])
+
+
+def write_history_store(df_transactions: pd.DataFrame, store_path: Path, index_path: Path) -> int:
+    """
+    Grava o histórico de transações ordenado por `project_id`, junto com um índice de offsets.
+
+    Args:
+        df_transactions (pd.DataFrame): Transações com as colunas 'project_id', 'transaction_date',
+                                        'transaction_type', 'quantity' e 'vintage'.
+        store_path (Path): Caminho do arquivo .npy com os registros de todas as transações.
+        index_path (Path): Caminho do CSV com 'project_id', 'offset' e 'length' de cada projeto.
+
+    Returns:
+        int: O número de projetos presentes no índice.
+    """
+    df_sorted = df_transactions.sort_values(['project_id', 'transaction_date'], kind='mergesort')
+
+    records = np.empty(len(df_sorted), dtype=HISTORY_DTYPE)
+    records["transaction_date"] = df_sorted['transaction_date'].to_numpy(dtype="datetime64[D]")
+    records["transaction_type"] = df_sorted['transaction_type'].map(TRANSACTION_TYPE_CODES).fillna(-1).to_numpy()
+    records["quantity"] = pd.to_numeric(df_sorted['quantity'], errors='coerce').to_numpy(dtype="f8")
+    records["vintage"] = pd.to_numeric(df_sorted['vintage'], errors='coerce').to_numpy(dtype="f8")
+
+    # Grava em arquivos temporários e troca com os.replace: o app pode estar com o .npy antigo mapeado
+    # em memória, e sobrescrevê-lo no lugar (truncando) derrubaria o processo com SIGBUS.
+    tmp_store = Path(store_path).with_name(f"{Path(store_path).name}.{os.getpid()}.tmp")
+    with open(tmp_store, "wb") as f:
+        np.save(f, records)
+
+    # Como os registros estão ordenados, cada projeto ocupa um intervalo [offset, offset + length).
+    project_ids, offsets, lengths = np.unique(
+        df_sorted['project_id'].to_numpy(dtype=str), return_index=True, return_counts=True
+    )
+    df_index = pd.DataFrame({'project_id': project_ids, 'offset': offsets, 'length': lengths})
+    tmp_index = Path(index_path).with_name(f"{Path(index_path).name}.{os.getpid()}.tmp")
+    df_index.to_csv(tmp_index, index=False)
+
+    os.replace(tmp_store, store_path)
+    os.replace(tmp_index, index_path)
+    return len(df_index)
+
+
+def store_version(store_path: Path, index_path: Path) -> tuple:
+    """Versão do armazenamento (inode, tamanho e mtime dos dois arquivos), usada como chave de cache."""
+    versao = []
+    for path in (store_path, index_path):
+        stat = os.stat(path)
+        versao.extend([stat.st_ino, stat.st_size, stat.st_mtime_ns])
+    return tuple(versao)
+
+
+def open_history_store(store_path: Path, index_path: Path):
+    """
+    Abre o armazenamento de histórico em modo memory-mapped e carrega o índice de offsets.
+
+    Returns:
+        tuple: (np.memmap com os registros, dict de project_id -> (offset, length)).
+    """
+    records = np.load(store_path, mmap_mode='r')
+    df_index = pd.read_csv(index_path, dtype={'project_id': str})
+
+    # Os dois arquivos são trocados um após o outro; se forem de gerações diferentes, os offsets
+    # não cobrem exatamente os registros e o par é recusado (o próximo acesso relê os dois).
+    if int((df_index['offset'] + df_index['length']).max() if len(df_index) else 0) != len(records):
+        raise HistoryStoreMismatchError("Índice e registros do histórico são de gerações diferentes (pipeline em execução?).")
+    index = dict(zip(df_index['project_id'], zip(df_index['offset'], df_index['length'])))
+    return records, index
+
+
+def read_project_history(records: np.ndarray, index: dict, project_id: str) -> pd.DataFrame:
+    """
+    Retorna o histórico completo de um projeto como um DataFrame.
+
+    A busca é uma consulta ao dicionário seguida de uma única fatia contígua do arquivo mapeado,
+    portanto o custo não depende do tamanho total do ledger.
+    """
+    offset, length = index.get(project_id, (0, 0))
+    history = records[offset:offset + length]
+    return pd.DataFrame({
+        'transaction_date': pd.to_datetime(history["transaction_date"]),
+        'transaction_type': pd.Series(history["transaction_type"]).map(TRANSACTION_TYPE_LABELS),
+        'quantity': history["quantity"],
+        'vintage': history["vintage"],
+    })
@@ -0,0 +1,270 @@
+import argparse
+import gc
+import hashlib
+import json
+import os
+import sys
+import numpy as np
+import pandas as pd
+from multiprocessing import shared_memory
+from pathlib import Path
+from typing import Dict, Optional
+from . import config
+
+# Compartilhamento dos datasets entre vários processos do Streamlit no mesmo host.
+#
+# Ciclo de vida:
+#   1. `python -m src.shared_data publish` lê os CSVs de config.SHARED_DATASETS e copia cada coluna
+#      numérica (ou os códigos das colunas categóricas) para um segmento de memória compartilhada.
+#      Um manifesto JSON descreve os segmentos e a versão (derivada do tamanho/mtime dos CSVs).
+#   2. Os processos do Streamlit com BECARBON_SHARED_MEMORY=1 leem o manifesto e anexam os segmentos
+#      como arrays somente leitura, sem cópia.
+#   3. Um novo `publish` com CSVs alterados cria segmentos da nova versão, troca o manifesto de forma
+#      atômica e remove os antigos. Processos já anexados continuam válidos até descartarem o mapeamento:
+#      no próximo rerun eles anexam a nova versão e fecham a antiga (`release_stale`).
+#   4. `python -m src.shared_data unlink` remove os segmentos e o manifesto.
+
+MANIFEST_FORMAT = 1
+
+# Segmentos anexados por este processo, por versão. Precisam ficar referenciados enquanto os arrays existirem.
+_ATTACHED: Dict[str, list] = {}
+
+# Último manifesto lido, reaproveitado enquanto o arquivo não muda (evita reler o JSON a cada rerun)
+_MANIFEST_CACHE: Dict[str, object] = {'stat': None, 'manifest': None}
+
+
+def _open_segment(name: str, create: bool = False, size: int = 0) -> shared_memory.SharedMemory:
+    """
+    Abre (ou cria) um segmento sem registrá-lo no resource_tracker do Python, que de outra forma
+    o removeria quando o processo que o abriu terminasse.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, create=create, size=size, track=False)
+
+    from multiprocessing import resource_tracker
+    shm = shared_memory.SharedMemory(name=name, create=create, size=size)
+    resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+    return shm
+
+
+def _unlink_segment(shm: shared_memory.SharedMemory) -> None:
+    """
+    Remove um segmento. Antes do Python 3.13 o SharedMemory.unlink() também desregistra o segmento
+    do resource_tracker, o que falharia (KeyError) já que _open_segment nunca o registrou.
+    """
+    if sys.version_info >= (3, 13):
+        shm.unlink()
+    elif os.name == "posix":
+        import _posixshmem  # type: ignore[import-not-found]
+        _posixshmem.shm_unlink(shm._name)  # type: ignore[attr-defined]
+    # No Windows o segmento é liberado quando o último handle é fechado
+
+
+def datasets_version(datasets: Dict[str, Path]) -> str:
+    """Versão dos datasets, derivada do nome, tamanho e data de modificação de cada arquivo."""
+    digest = hashlib.blake2b(digest_size=6)
+    for name, path in datasets.items():
+        stat = Path(path).stat()
+        digest.update(f"{name}:{path}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+def read_manifest(manifest_path: Path = config.SHARED_MEMORY_MANIFEST_FILE) -> dict:
+    """Lê o manifesto. Levanta FileNotFoundError se nenhum dataset foi publicado."""
+    stat = os.stat(manifest_path)
+    chave = (str(manifest_path), stat.st_ino, stat.st_size, stat.st_mtime_ns)
+    if _MANIFEST_CACHE['stat'] != chave:
+        with open(manifest_path) as f:
+            _MANIFEST_CACHE['manifest'] = json.load(f)
+        _MANIFEST_CACHE['stat'] = chave
+    return _MANIFEST_CACHE['manifest']  # type: ignore[return-value]
+
+
+def _segments(manifest: dict):
+    for dataset in manifest['datasets'].values():
+        for column in dataset['columns']:
+            yield column['segment']
+
+
+def _segments_alive(manifest: dict) -> bool:
+    try:
+        for name in _segments(manifest):
+            _open_segment(name).close()
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def _unlink_segments(manifest: dict) -> None:
+    for name in _segments(manifest):
+        try:
+            shm = _open_segment(name)
+        except FileNotFoundError:
+            continue
+        shm.close()
+        _unlink_segment(shm)
+
+
+def publish(
+    datasets: Dict[str, Path] = config.SHARED_DATASETS,
+    manifest_path: Path = config.SHARED_MEMORY_MANIFEST_FILE
+) -> dict:
+    """
+    Publica os datasets em memória compartilhada e grava o manifesto.
+    Não faz nada se a versão publicada já corresponde aos arquivos atuais.
+
+    Returns:
+        dict: O manifesto em vigor.
+    """
+    version = datasets_version(datasets)
+    try:
+        current: Optional[dict] = read_manifest(manifest_path)
+    except FileNotFoundError:
+        current = None
+
+    if current is not None and current['version'] == version:
+        if _segments_alive(current):
+            return current
+        # Segmentos perdidos (ex.: reinício do host): remove o que sobrou antes de recriar com os mesmos nomes
+        _unlink_segments(current)
+
+    manifest = {'format': MANIFEST_FORMAT, 'version': version, 'datasets': {}}
+    try:
+        for d_idx, (name, path) in enumerate(datasets.items()):
+            df = pd.read_csv(path)
+            columns = []
+            manifest['datasets'][name] = {'columns': columns}
+            for c_idx, column in enumerate(df.columns):
+                series = df[column]
+                categories = None
+                if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+                    kind, values = 'numeric', series.to_numpy()
+                else:
+                    categorical = series.astype('category')
+                    kind, values = 'categorical', categorical.cat.codes.to_numpy()
+                    categories = categorical.cat.categories.tolist()
+
+                segment = f"bc_{version}_{d_idx}_{c_idx}"
+                columns.append({
+                    'name': column,
+                    'kind': kind,
+                    'dtype': values.dtype.str,
+                    'length': len(values),
+                    'segment': segment,
+                    'categories': categories,
+                })
+
+                shm = _open_segment(segment, create=True, size=max(values.nbytes, 1))
+                np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[:] = values
+                shm.close()
+    except BaseException:
+        _unlink_segments(manifest)
+        raise
+
+    # Troca atômica do manifesto: leitores veem a versão antiga ou a nova, nunca um arquivo parcial
+    tmp_path = Path(f"{manifest_path}.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, manifest_path)
+
+    if current is not None and current['version'] != version:
+        _unlink_segments(current)
+    return manifest
+
+
+def attach(manifest: dict) -> Dict[str, pd.DataFrame]:
+    """
+    Anexa os datasets descritos em `manifest` como DataFrames somente leitura, sem cópia.
+
+    Colunas numéricas são views dos segmentos. Colunas categóricas são reconstruídas com
+    Categorical.from_codes e seus códigos internos (`df[col].array.codes`) também apontam para
+    o segmento; note que `df[col].cat.codes` devolve uma Series nova, portanto uma cópia.
+
+    Args:
+        manifest (dict): Manifesto já lido com `read_manifest`. Recebê-lo pronto garante que a
+                         versão usada como chave de cache é a mesma dos segmentos anexados.
+
+    Returns:
+        Dict[str, pd.DataFrame]: Um DataFrame por dataset, na ordem do manifesto.
+    """
+    handles = []
+    dataframes = {}
+    for name, dataset in manifest['datasets'].items():
+        arrays = {}
+        for column in dataset['columns']:
+            shm = _open_segment(column['segment'])
+            handles.append(shm)
+            values = np.ndarray((column['length'],), dtype=np.dtype(column['dtype']), buffer=shm.buf)
+            values.flags.writeable = False
+            if column['kind'] == 'categorical':
+                values = pd.Categorical.from_codes(values, categories=column['categories'])
+            arrays[column['name']] = pd.Series(values, name=column['name'], copy=False)
+        # copy=False mantém um bloco por coluna, apontando direto para a memória compartilhada
+        dataframes[name] = pd.DataFrame(arrays, copy=False)
+
+    _ATTACHED.setdefault(manifest['version'], []).extend(handles)
+    return dataframes
+
+
+def release_stale(current_version: str) -> None:
+    """
+    Fecha os segmentos anexados de versões anteriores a `current_version`.
+
+    Só é possível fechar um segmento depois que nenhum array aponta mais para ele (o chamador deve
+    descartar os DataFrames antigos antes, ex.: limpando o cache). Se alguma sessão ainda estiver
+    usando a versão antiga, o fechamento é adiado para a próxima chamada.
+    """
+    antigas = [version for version in _ATTACHED if version != current_version]
+    if not antigas:
+        return
+
+    gc.collect()  # libera ciclos que ainda referenciem os DataFrames antigos
+    for version in antigas:
+        pendentes = []
+        for shm in _ATTACHED[version]:
+            try:
+                shm.close()
+            except BufferError:
+                pendentes.append(shm)
+        if pendentes:
+            _ATTACHED[version] = pendentes
+        else:
+            del _ATTACHED[version]
+
+
+def unlink(manifest_path: Path = config.SHARED_MEMORY_MANIFEST_FILE) -> None:
+    """Remove todos os segmentos publicados e o manifesto."""
+    try:
+        manifest = read_manifest(manifest_path)
+    except FileNotFoundError:
+        return
+    _unlink_segments(manifest)
+    Path(manifest_path).unlink(missing_ok=True)
+
+
+def _status(manifest_path: Path) -> None:
+    try:
+        manifest = read_manifest(manifest_path)
+    except FileNotFoundError:
+        print("Nenhum dataset publicado.")
+        return
+    print(f"Versão publicada: {manifest['version']} ({'ativa' if _segments_alive(manifest) else 'segmentos ausentes'})")
+    for name, dataset in manifest['datasets'].items():
+        n_bytes = sum(np.dtype(c['dtype']).itemsize * c['length'] for c in dataset['columns'])
+        n_rows = dataset['columns'][0]['length'] if dataset['columns'] else 0
+        print(f"   - {name}: {n_rows:,} linhas, {len(dataset['columns'])} colunas, {n_bytes / (1024 * 1024):.1f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gerencia os datasets em memória compartilhada.")
+    parser.add_argument("command", choices=["publish", "unlink", "status"])
+    args = parser.parse_args()
+
+    if args.command == "publish":
+        publish()
+        _status(config.SHARED_MEMORY_MANIFEST_FILE)
+    elif args.command == "unlink":
+        unlink()
+        print("Segmentos e manifesto removidos.")
+    else:
+        _status(config.SHARED_MEMORY_MANIFEST_FILE)
@@ -5,4 +5,8 @@ class DataFileNotFoundError(Exception):
 
 class InvalidFilterError(Exception):
     """Erro customizado para ser levantado se uma opção de filtro inválida for passada."""
+    pass
+
+class HistoryStoreMismatchError(Exception):
+    """Erro customizado para ser levantado quando o índice e os registros do histórico por projeto não correspondem."""
     pass
\ No newline at end of file
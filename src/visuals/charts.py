@@ -1,10 +1,21 @@
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from typing import Optional, Tuple
+from .. import config
 
 # Definimos uma paleta de cores padrão para usar nos gráficos
 DEFAULT_COLOR_PALETTE = px.colors.sequential.Teal
 
+# Acima deste número de projetos o mapa de oportunidades deixa de desenhar um ponto por projeto
+# e passa a agregar os dados no servidor em uma grade de tamanho fixo (idade x log do volume).
+SCATTER_MAX_POINTS = 5000
+# Bins de log10(volume) do mapa de densidade. As idades são inteiras e usam bins de 1 ano
+# centrados em cada idade, alargados (em anos inteiros) se passarem de SCATTER_MAX_AGE_BINS.
+SCATTER_VOLUME_BINS = 40
+SCATTER_MAX_AGE_BINS = 60
+
 def create_bar_chart(df: pd.DataFrame, x_axis: str, y_axis: str, title: str) -> go.Figure:
     """
     Cria e retorna um gráfico de barras interativo usando o Plotly Express.
@@ -76,19 +87,37 @@ def create_heatmap(df_analise: pd.DataFrame, top_countries: list, top_categories
     )
     return fig
 
-def create_opportunity_scatter_plot(df: pd.DataFrame) -> go.Figure:
+def create_opportunity_scatter_plot(
+    df: pd.DataFrame,
+    age_range: Optional[Tuple[float, float]] = None,
+    volume_range: Optional[Tuple[float, float]] = None
+) -> go.Figure:
     """
-    Cria um gráfico de dispersão interativo para visualizar as oportunidades.
+    Cria um gráfico interativo para visualizar as oportunidades, com renderização adaptativa.
+
+    Até SCATTER_MAX_POINTS projetos, cada um vira um ponto WebGL com hover detalhado. Acima disso,
+    os projetos são agregados no servidor em uma grade idade x log10(volume), colorida pelo score
+    médio, para que o tamanho do payload fique limitado independentemente do número de projetos.
 
     Args:
         df (pd.DataFrame): DataFrame com as oportunidades já filtradas e com score.
+        age_range (Tuple[float, float], optional): Intervalo de idade para o zoom (drill-down).
+        volume_range (Tuple[float, float], optional): Intervalo de volume disponível para o zoom.
 
     Returns:
-        go.Figure: O objeto do gráfico de dispersão.
+        go.Figure: O objeto do gráfico de dispersão ou do mapa de densidade.
     """
+    if age_range is not None:
+        df = df[df['idade_estimada'].between(*age_range)]
+    if volume_range is not None:
+        df = df[df['volume_disponivel'].between(*volume_range)]
+
     if df.empty:
         return go.Figure()
 
+    if len(df) > SCATTER_MAX_POINTS:
+        return _create_opportunity_density_plot(df)
+
     fig = px.scatter(
         df,
         x="idade_estimada",
@@ -98,7 +127,8 @@ def create_opportunity_scatter_plot(df: pd.DataFrame) -> go.Figure:
         hover_name="name",
         color_continuous_scale=px.colors.sequential.Viridis,
         size_max=60, # Define o tamanho máximo das bolhas
-        custom_data=['country', 'category', 'vintage', 'opportunity_score'] # Dados extras para o hover
+        custom_data=['country', 'category', 'vintage', 'opportunity_score'], # Dados extras para o hover
+        render_mode='webgl' # Scattergl: um único buffer na GPU em vez de um nó SVG por bolha
     )
     
     fig.update_traces(
@@ -121,6 +151,118 @@ def create_opportunity_scatter_plot(df: pd.DataFrame) -> go.Figure:
     )
     return fig
 
+def _create_opportunity_density_plot(df: pd.DataFrame) -> go.Figure:
+    """
+    Agrega as oportunidades em uma grade 2-D (idade x log10 do volume) com histogramas do NumPy.
+    Cada célula mostra o score médio dos projetos que caem nela; o número de células é limitado.
+    """
+    idade = df['idade_estimada'].to_numpy(dtype=float)
+    log_volume = np.log10(df['volume_disponivel'].clip(lower=1).to_numpy(dtype=float))
+    score = df['opportunity_score'].to_numpy(dtype=float)
+
+    # Bordas em meio-ano para que cada idade inteira caia no centro de um bin (sem faixas vazias)
+    largura = max(1, int(np.ceil((np.ceil(idade.max()) - np.floor(idade.min()) + 1) / SCATTER_MAX_AGE_BINS)))
+    bordas_idade = np.arange(np.floor(idade.min()) - 0.5, np.ceil(idade.max()) + 0.5 + largura, largura)
+
+    contagem, bordas_x, bordas_y = np.histogram2d(idade, log_volume, bins=[bordas_idade, SCATTER_VOLUME_BINS])
+    soma_score, _, _ = np.histogram2d(idade, log_volume, bins=[bordas_x, bordas_y], weights=score)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        score_medio = np.where(contagem > 0, soma_score / contagem, np.nan)
+
+    centros_x = (bordas_x[:-1] + bordas_x[1:]) / 2
+    centros_y = (bordas_y[:-1] + bordas_y[1:]) / 2
+    # Idades inteiras cobertas por cada coluna, mostradas no hover
+    idade_inicial = np.broadcast_to((bordas_x[:-1] + 0.5)[:, None], contagem.shape)
+    idade_final = np.broadcast_to((bordas_x[1:] - 0.5)[:, None], contagem.shape)
+    rotulo_idade = "%{customdata[1]:.0f} anos" if largura == 1 else "%{customdata[1]:.0f} a %{customdata[2]:.0f} anos"
+
+    fig = go.Figure(go.Heatmap(
+        x=centros_x,
+        y=10 ** centros_y,
+        z=score_medio.T,
+        customdata=np.dstack([contagem.T, idade_inicial.T, idade_final.T]),
+        colorscale='Viridis',
+        colorbar=dict(title="Score Médio"),
+        hoverongaps=False,
+        hovertemplate="<br>".join([
+            f"<b>Idade Estimada:</b> {rotulo_idade}",
+            "<b>Volume Disponível:</b> ~%{y:,.0f}",
+            "<b>Projetos:</b> %{customdata[0]:,.0f}",
+            "<b>Score Médio:</b> %{z:.3f}"
+        ]) + "<extra></extra>"
+    ))
+
+    fig.update_layout(
+        title=f"Mapa de Oportunidades ({len(df):,} projetos agregados - aplique zoom para detalhar)",
+        xaxis_title="Idade Estimada do Projeto (anos)",
+        yaxis_title="Volume de Créditos Disponíveis",
+        yaxis_type='log',
+        title_x=0.5
+    )
+    return fig
+
+def create_project_timeline_chart(df_history: pd.DataFrame, project_name: str) -> go.Figure:
+    """
+    Cria a linha do tempo de emissões e aposentadorias de um projeto.
+
+    Args:
+        df_history (pd.DataFrame): Histórico do projeto com 'transaction_date', 'transaction_type' e 'quantity'.
+        project_name (str): O nome do projeto, usado no título.
+
+    Returns:
+        go.Figure: Barras anuais por tipo de transação e a linha do saldo acumulado.
+
+    A linha cobre o histórico completo do projeto, enquanto o 'volume_disponivel' da tabela de
+    projetos considera apenas a janela do score (config.SCORING_WINDOW), destacada no gráfico.
+    """
+    if df_history.empty:
+        return go.Figure()
+
+    df_anual = (
+        df_history.assign(ano=df_history['transaction_date'].dt.to_period('Y').dt.to_timestamp())
+        .groupby(['ano', 'transaction_type'])['quantity'].sum()
+        .reset_index()
+    )
+
+    fig = px.bar(
+        df_anual,
+        x='ano',
+        y='quantity',
+        color='transaction_type',
+        barmode='group',
+        color_discrete_sequence=['#4a90a4', '#0d3b66', '#9e9e9e']
+    )
+
+    # Saldo acumulado sobre todo o histórico: emissões somam, aposentadorias subtraem
+    sinal = df_history['transaction_type'].map({'Emissão': 1, 'Aposentadoria': -1}).fillna(0)
+    saldo = (df_history['quantity'] * sinal).cumsum()
+    fig.add_trace(go.Scatter(
+        x=df_history['transaction_date'],
+        y=saldo,
+        mode='lines',
+        name='Saldo acumulado (histórico completo)',
+        line=dict(color='#f4a261', width=2)
+    ))
+
+    inicio, fim = config.SCORING_WINDOW
+    fig.add_vrect(
+        x0=pd.Timestamp(year=inicio, month=1, day=1),
+        x1=pd.Timestamp(year=fim, month=12, day=31),
+        fillcolor='rgba(74, 144, 164, 0.12)',
+        line_width=0,
+        annotation_text=f"Janela do score ({inicio}-{fim})",
+        annotation_position='top left'
+    )
+
+    fig.update_layout(
+        title=f"Histórico de Transações - {project_name}",
+        xaxis_title=None,
+        yaxis_title="Créditos",
+        legend_title=None,
+        title_x=0.5
+    )
+    return fig
+
 def create_gauge_chart(score: float) -> go.Figure:
     """
     Cria um gráfico de medidor (gauge) para exibir um score de 0 a 100.